@@ -2,7 +2,10 @@ import os
 from flask import Flask
 
 from .admin import bp as admin_bp
+from .estados import criar_registro
+from .exportacao import exportar_command
 from .public import bp as public_bp
+from .regioes import carregar_regioes_geojson
 
 
 def create_app():
@@ -15,9 +18,17 @@ def create_app():
     app.secret_key = os.environ.get("SECRET_KEY", "chave-secreta-trocar")
     app.config['ADMIN_USER'] = os.environ.get("ADMIN_USER", "admin")
     app.config['ADMIN_PASS'] = os.environ.get("ADMIN_PASS", "fcee2025")
+    app.config['EXPORT_DIR'] = os.environ.get("EXPORT_DIR")
+
+    # Registro das UFs disponíveis; os dados de cada estado só são lidos no primeiro acesso.
+    app.extensions['estados'] = criar_registro()
 
     app.register_blueprint(public_bp)
     app.register_blueprint(admin_bp)
+    app.cli.add_command(exportar_command)
+
+    # Pré-calcula as regiões dissolvidas para que o primeiro acesso ao mapa não pague o custo.
+    carregar_regioes_geojson(os.path.join(os.path.dirname(__file__), '..', 'sc_municipios.geojson'))
 
     return app
 
@@ -1,8 +1,10 @@
 from flask import Blueprint, current_app, redirect, render_template, request, session, url_for
 
+from .exportacao import exportar_apos_salvar
 from .storage import (
     load_dados,
     load_demografia_rows,
+    mapear_municipio_regiao,
     normalize_numeric_field,
     resumir_instituicoes,
     save_demografia,
@@ -126,6 +128,7 @@ def admin_home():
 
             save_demografia(linhas)
 
+        exportar_apos_salvar()
         return redirect(url_for('admin.admin_home'))
 
     return render_template(
@@ -135,4 +138,5 @@ def admin_home():
         regiao_opcoes=regiao_opcoes,
         faixas_opcoes=faixas_opcoes,
         instituicoes_resumo=resumir_instituicoes(instituicoes),
+        municipio_regiao=mapear_municipio_regiao(instituicoes),
     )
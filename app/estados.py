@@ -0,0 +1,152 @@
+import os
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional
+
+from .regioes import serializar_regioes_geojson
+from .storage import CSV_FILE, DEMO_FILE
+
+RAIZ = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+# Cada subpasta com a sigla da UF (ex.: estados/pr/) traz dados.csv, municipios.geojson e,
+# opcionalmente, demografia.csv.
+DATASETS_DIR = os.environ.get("DATASETS_DIR", os.path.join(RAIZ, "estados"))
+DATASET_CACHE_MB = float(os.environ.get("DATASET_CACHE_MB", "64"))
+
+
+def descobrir_estados(datasets_dir: str = DATASETS_DIR) -> Dict[str, dict]:
+    """Monta o registro UF -> arquivos do estado, sem ler nenhum dado.
+
+    SC usa sempre os arquivos da raiz do repositório, os mesmos que o admin e as rotas
+    antigas leem e gravam; uma pasta ``estados/sc/`` é ignorada.
+    """
+    estados: Dict[str, dict] = {
+        "sc": {
+            "uf": "sc",
+            "csv": CSV_FILE,
+            "demografia": DEMO_FILE,
+            "geojson": os.path.join(RAIZ, "sc_municipios.geojson"),
+        }
+    }
+
+    if os.path.isdir(datasets_dir):
+        for nome in sorted(os.listdir(datasets_dir)):
+            pasta = os.path.join(datasets_dir, nome)
+            geojson = os.path.join(pasta, "municipios.geojson")
+            csv_file = os.path.join(pasta, "dados.csv")
+            # Sem dados.csv a página do estado não carrega, então a UF nem entra no registro.
+            if len(nome) != 2 or not nome.isalpha() or not os.path.exists(geojson) or not os.path.exists(csv_file):
+                continue
+            uf = nome.lower()
+            if uf in estados:
+                continue
+            estados[uf] = {
+                "uf": uf,
+                "csv": csv_file,
+                "demografia": os.path.join(pasta, "demografia.csv"),
+                "geojson": geojson,
+            }
+
+    return estados
+
+
+def _versao_estado(estado: dict) -> str:
+    partes = []
+    for chave in ("csv", "demografia", "geojson"):
+        try:
+            stat = os.stat(estado[chave])
+            partes += [stat.st_mtime_ns, stat.st_size]
+        except OSError:
+            partes += [0, 0]
+    return "-".join(str(parte) for parte in partes)
+
+
+def _ler_arquivo(caminho: str) -> Optional[bytes]:
+    if not os.path.exists(caminho):
+        return None
+    with open(caminho, "rb") as f:
+        return f.read()
+
+
+def _carregar_estado(estado: dict, versao: str) -> dict:
+    # Guarda exatamente os bytes que o app.js busca; o navegador faz o parse dos CSV.
+    arquivos = {
+        "dados_csv": _ler_arquivo(estado["csv"]),
+        "demografia_csv": _ler_arquivo(estado["demografia"]),
+        "municipios_geojson": _ler_arquivo(estado["geojson"]),
+        "regioes_geojson": serializar_regioes_geojson(estado["geojson"], estado["csv"]),
+    }
+
+    return dict(
+        arquivos,
+        uf=estado["uf"],
+        versao=versao,
+        tamanho=sum(len(conteudo) for conteudo in arquivos.values() if conteudo),
+    )
+
+
+class RegistroEstados:
+    """Registro de estados com os dados de cada um carregados sob demanda.
+
+    Os dados já carregados ficam num LRU limitado a ``limite_bytes``; o estado
+    usado há mais tempo é descartado primeiro. Um estado maior que o limite
+    ainda é servido, mas fica sozinho no cache.
+    """
+
+    def __init__(self, estados: Dict[str, dict], limite_bytes: int):
+        self.estados = estados
+        self.limite_bytes = limite_bytes
+        self._cache: "OrderedDict[str, dict]" = OrderedDict()
+        self._ocupado = 0
+        self._trava = threading.Lock()
+        # Uma trava de carga por UF: requisições simultâneas a um estado frio esperam a mesma leitura.
+        self._carregando: Dict[str, threading.Lock] = {uf: threading.Lock() for uf in estados}
+
+    def __contains__(self, uf: str) -> bool:
+        return uf.lower() in self.estados
+
+    def obter(self, uf: str) -> Optional[dict]:
+        uf = uf.lower()
+        estado = self.estados.get(uf)
+        if estado is None:
+            return None
+
+        versao = _versao_estado(estado)
+        dados = self._em_cache(uf, versao)
+        if dados is not None:
+            return dados
+
+        # A leitura fica fora da trava geral para não bloquear os outros estados.
+        with self._carregando[uf]:
+            dados = self._em_cache(uf, versao)
+            if dados is not None:
+                return dados
+            dados = _carregar_estado(estado, versao)
+
+            with self._trava:
+                anterior = self._cache.pop(uf, None)
+                if anterior is not None:
+                    self._ocupado -= anterior["tamanho"]
+                self._cache[uf] = dados
+                self._ocupado += dados["tamanho"]
+                while self._ocupado > self.limite_bytes and len(self._cache) > 1:
+                    _, descartado = self._cache.popitem(last=False)
+                    self._ocupado -= descartado["tamanho"]
+
+        return dados
+
+    def _em_cache(self, uf: str, versao: str) -> Optional[dict]:
+        with self._trava:
+            dados = self._cache.get(uf)
+            if dados is not None and dados["versao"] == versao:
+                self._cache.move_to_end(uf)
+                return dados
+        return None
+
+    def carregados(self):
+        with self._trava:
+            return list(self._cache)
+
+
+def criar_registro() -> RegistroEstados:
+    return RegistroEstados(descobrir_estados(), int(DATASET_CACHE_MB * 1024 * 1024))
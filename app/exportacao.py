@@ -0,0 +1,213 @@
+import gzip
+import hashlib
+import json
+import os
+import tempfile
+from typing import Callable, Dict, List, Tuple
+
+import click
+from flask import Flask, current_app, render_template
+from flask.cli import with_appcontext
+
+from .regioes import carregar_regioes_geojson, serializar_regioes_geojson
+from .storage import CSV_FILE, DEMO_FILE, contexto_index
+
+MANIFESTO = ".manifesto.json"
+
+# (nome do artefato, arquivos de entrada, função que gera o conteúdo)
+Artefato = Tuple[str, List[str], Callable[[], bytes]]
+
+
+def escrever_atomico(caminho: str, conteudo: bytes):
+    diretorio = os.path.dirname(caminho) or "."
+    os.makedirs(diretorio, exist_ok=True)
+    fd, temporario = tempfile.mkstemp(dir=diretorio, prefix=".tmp-")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(conteudo)
+            f.flush()
+            os.fsync(f.fileno())
+        os.chmod(temporario, 0o644)
+        os.replace(temporario, caminho)
+    except BaseException:
+        if os.path.exists(temporario):
+            os.remove(temporario)
+        raise
+
+
+def _ler_bytes(caminho: str) -> Callable[[], bytes]:
+    def gerar():
+        with open(caminho, "rb") as f:
+            return f.read()
+    return gerar
+
+
+def _gzip(gerar: Callable[[], bytes]) -> Callable[[], bytes]:
+    # mtime fixo: o mesmo conteúdo sempre gera o mesmo .gz.
+    return lambda: gzip.compress(gerar(), compresslevel=9, mtime=0)
+
+
+def _impressao_digital(entradas: List[str]) -> str:
+    h = hashlib.sha256()
+    for caminho in entradas:
+        h.update(caminho.encode("utf-8"))
+        if os.path.exists(caminho):
+            with open(caminho, "rb") as f:
+                h.update(f.read())
+        else:
+            h.update(b"\0ausente")
+    return h.hexdigest()
+
+
+def _artefatos_estado(app: Flask, estado: dict, template_index: str) -> List[Artefato]:
+    uf = estado["uf"]
+    csv_file, demo_file, geojson_path = estado["csv"], estado["demografia"], estado["geojson"]
+
+    def gerar_index() -> bytes:
+        with app.test_request_context(f"/{uf}/"):
+            return render_template("index.html", uf=uf).encode("utf-8")
+
+    def gerar_regioes() -> bytes:
+        return serializar_regioes_geojson(geojson_path, csv_file)
+
+    # Mesmos caminhos das rotas /<uf>/..., que o app.js busca relativos à página do estado.
+    artefatos: List[Artefato] = [
+        (f"{uf}/index.html", [template_index], gerar_index),
+        (f"{uf}/dados.csv", [csv_file], _ler_bytes(csv_file)),
+        (f"{uf}/municipios.geojson", [geojson_path], _ler_bytes(geojson_path)),
+        (f"{uf}/municipios.geojson.gz", [geojson_path], _gzip(_ler_bytes(geojson_path))),
+        (f"{uf}/regioes.geojson", [csv_file, geojson_path], gerar_regioes),
+        (f"{uf}/regioes.geojson.gz", [csv_file, geojson_path], _gzip(gerar_regioes)),
+    ]
+    if os.path.exists(demo_file):
+        artefatos.append((f"{uf}/demografia.csv", [demo_file], _ler_bytes(demo_file)))
+    return artefatos
+
+
+def listar_artefatos(app: Flask) -> List[Artefato]:
+    raiz = os.path.abspath(os.path.join(app.root_path, ".."))
+    geojson_path = os.path.join(raiz, "sc_municipios.geojson")
+    template_index = os.path.join(app.template_folder, "index.html")
+    dados = [CSV_FILE, DEMO_FILE]
+
+    def gerar_index() -> bytes:
+        # O template não usa os dados (o app.js lê os CSV), então o index depende só dele.
+        with app.test_request_context("/"):
+            return render_template("index.html").encode("utf-8")
+
+    def gerar_dados_json() -> bytes:
+        return json.dumps(contexto_index(), ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+    def gerar_regioes() -> bytes:
+        return carregar_regioes_geojson(geojson_path)[1]
+
+    artefatos: List[Artefato] = [
+        ("index.html", [template_index], gerar_index),
+        ("dados.json", dados, gerar_dados_json),
+    ]
+    # O app.js lê os CSV e o GeoJSON ao lado do index.html, então eles são publicados como estão.
+    for nome, origem in (("dados.csv", CSV_FILE), ("demografia.csv", DEMO_FILE)):
+        if os.path.exists(origem):
+            artefatos.append((nome, [origem], _ler_bytes(origem)))
+    if os.path.exists(geojson_path):
+        artefatos += [
+            ("sc_municipios.geojson", [geojson_path], _ler_bytes(geojson_path)),
+            ("sc_municipios.geojson.gz", [geojson_path], _gzip(_ler_bytes(geojson_path))),
+            ("sc_regioes.geojson", [CSV_FILE, geojson_path], gerar_regioes),
+            ("sc_regioes.geojson.gz", [CSV_FILE, geojson_path], _gzip(gerar_regioes)),
+        ]
+
+    for estado in app.extensions['estados'].estados.values():
+        artefatos += _artefatos_estado(app, estado, template_index)
+
+    for pasta, _, arquivos in os.walk(app.static_folder):
+        for arquivo in sorted(arquivos):
+            origem = os.path.join(pasta, arquivo)
+            relativo = os.path.relpath(origem, app.static_folder).replace(os.sep, "/")
+            artefatos.append((f"static/{relativo}", [origem], _ler_bytes(origem)))
+
+    return artefatos
+
+
+def _remover_obsoleto(destino: str, nome: str):
+    raiz = os.path.realpath(destino)
+    alvo = os.path.realpath(os.path.join(raiz, *nome.split("/")))
+    # O manifesto é lido do disco: nunca apaga nada fora do diretório exportado.
+    if os.path.commonpath([raiz, alvo]) != raiz or alvo == raiz:
+        return
+    if os.path.isfile(alvo):
+        os.remove(alvo)
+
+    pasta = os.path.dirname(alvo)
+    while pasta != raiz and os.path.commonpath([raiz, pasta]) == raiz:
+        try:
+            os.rmdir(pasta)
+        except OSError:
+            break
+        pasta = os.path.dirname(pasta)
+
+
+def exportar_site(app: Flask, destino: str, forcar: bool = False) -> List[str]:
+    """Grava a parte pública do site em ``destino`` e devolve os artefatos regerados.
+
+    Só são regerados os artefatos cujas entradas mudaram desde a última exportação
+    (conforme o manifesto gravado junto) ou que não existem mais no destino.
+    Artefatos do manifesto anterior que deixaram de existir são apagados.
+    """
+    manifesto_path = os.path.join(destino, MANIFESTO)
+    manifesto: Dict[str, str] = {}
+    if os.path.exists(manifesto_path):
+        try:
+            with open(manifesto_path, encoding="utf-8") as f:
+                manifesto = json.load(f)
+        except (OSError, ValueError):
+            manifesto = {}
+
+    novo_manifesto: Dict[str, str] = {}
+    regerados: List[str] = []
+    for nome, entradas, gerar in listar_artefatos(app):
+        digital = _impressao_digital(entradas)
+        novo_manifesto[nome] = digital
+        alvo = os.path.join(destino, *nome.split("/"))
+        if not forcar and manifesto.get(nome) == digital and os.path.exists(alvo):
+            continue
+
+        escrever_atomico(alvo, gerar())
+        regerados.append(nome)
+
+    for nome in sorted(set(manifesto) - set(novo_manifesto)):
+        _remover_obsoleto(destino, nome)
+
+    if regerados or novo_manifesto != manifesto:
+        escrever_atomico(manifesto_path, json.dumps(novo_manifesto, indent=2, sort_keys=True).encode("utf-8"))
+    return regerados
+
+
+def exportar_apos_salvar():
+    """Reexporta o site estático depois de um salvamento no admin, se EXPORT_DIR estiver definido."""
+    destino = current_app.config.get("EXPORT_DIR")
+    if not destino:
+        return
+    try:
+        exportar_site(current_app._get_current_object(), destino)
+    except Exception:
+        # O salvamento já foi feito; uma falha na exportação não deve derrubar o admin.
+        current_app.logger.exception("Falha ao exportar o site estático para %s", destino)
+
+
+@click.command("exportar")
+@click.argument("destino", required=False)
+@click.option("--forcar", is_flag=True, help="Regera todos os artefatos, ignorando o manifesto.")
+@with_appcontext
+def exportar_command(destino, forcar):
+    """Exporta a parte pública do site como arquivos estáticos."""
+    destino = destino or current_app.config.get("EXPORT_DIR")
+    if not destino:
+        raise click.UsageError("Informe o diretório de destino ou defina EXPORT_DIR.")
+
+    regerados = exportar_site(current_app._get_current_object(), destino, forcar=forcar)
+    if regerados:
+        for nome in regerados:
+            click.echo(f"atualizado: {nome}")
+    else:
+        click.echo("Nada mudou; exportação já está atualizada.")
@@ -1,32 +1,86 @@
+import os
 from pathlib import Path
-from flask import Blueprint, current_app, render_template, send_from_directory
+from flask import Blueprint, abort, current_app, redirect, render_template, request, send_file, send_from_directory, url_for
 
-from .storage import (
-    load_dados,
-    load_demografia_rows,
-    preparar_demografia_por_deficiencia,
-    resumir_instituicoes,
-)
+from .regioes import carregar_regioes_geojson
+from .storage import CSV_FILE, DEMO_FILE, contexto_index
 
 bp = Blueprint('public', __name__)
 
 
+def _geojson_response(payload, versao):
+    response = current_app.response_class(payload, mimetype='application/geo+json')
+    response.set_etag(versao)
+    return response.make_conditional(request)
+
+
 @bp.route('/')
 def index():
-    municipios_status, municipios_instituicoes, municipios_totais = load_dados()
-    demografia_registros = load_demografia_rows()
-    instituicoes_resumo = resumir_instituicoes(municipios_instituicoes)
-    return render_template(
-        'index.html',
-        municipiosStatus=municipios_status,
-        municipiosInstituicoes=municipios_instituicoes,
-        municipiosTotais=municipios_totais,
-        demografia_distribuicao=preparar_demografia_por_deficiencia(demografia_registros),
-        instituicoes_resumo=instituicoes_resumo,
-    )
+    return render_template('index.html', **contexto_index())
+
+
+@bp.route('/<any(dados, demografia):nome>.csv')
+def csv_dados(nome):
+    caminho = CSV_FILE if nome == "dados" else DEMO_FILE
+    if not os.path.exists(caminho):
+        abort(404)
+    return send_file(os.path.abspath(caminho), mimetype='text/csv')
 
 
 @bp.route('/sc_municipios.geojson')
 def geojson():
     root_dir = Path(current_app.root_path).parent
     return send_from_directory(root_dir, 'sc_municipios.geojson')
+
+
+@bp.route('/sc_regioes.geojson')
+def regioes_geojson():
+    root_dir = Path(current_app.root_path).parent
+    versao, payload = carregar_regioes_geojson(str(root_dir / 'sc_municipios.geojson'))
+    return _geojson_response(payload, versao)
+
+
+@bp.before_request
+def _uf_minuscula():
+    # Uma única URL pública por estado: /SC/ redireciona para /sc/.
+    uf = (request.view_args or {}).get('uf')
+    if uf and uf != uf.lower():
+        return redirect(url_for(request.endpoint, **dict(request.view_args, uf=uf.lower())), code=301)
+    return None
+
+
+def _estado_ou_404(uf):
+    dados = current_app.extensions['estados'].obter(uf)
+    if dados is None:
+        abort(404)
+    return dados
+
+
+@bp.route('/<string(length=2):uf>/')
+def index_estado(uf):
+    if uf not in current_app.extensions['estados']:
+        abort(404)
+    return render_template('index.html', uf=uf)
+
+
+@bp.route('/<string(length=2):uf>/municipios.geojson')
+def geojson_estado(uf):
+    dados = _estado_ou_404(uf)
+    return _geojson_response(dados["municipios_geojson"], dados["versao"])
+
+
+@bp.route('/<string(length=2):uf>/regioes.geojson')
+def regioes_geojson_estado(uf):
+    dados = _estado_ou_404(uf)
+    return _geojson_response(dados["regioes_geojson"], dados["versao"])
+
+
+@bp.route('/<string(length=2):uf>/<any(dados, demografia):nome>.csv')
+def csv_estado(uf, nome):
+    dados = _estado_ou_404(uf)
+    conteudo = dados[f"{nome}_csv"]
+    if conteudo is None:
+        abort(404)
+    response = current_app.response_class(conteudo, mimetype='text/csv')
+    response.set_etag(dados["versao"])
+    return response.make_conditional(request)
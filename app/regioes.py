@@ -0,0 +1,232 @@
+import json
+import os
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+
+from .storage import CSV_FILE, load_dados, mapear_municipio_regiao, resumir_instituicoes
+
+Ponto = Tuple[float, float]
+Anel = List[Ponto]
+
+# Camada usada só em zoom baixo (<= 7, ~1 km por pixel): ~500 m de tolerância e ~10 m de precisão bastam.
+TOLERANCIA_SIMPLIFICACAO = 0.005
+CASAS_DECIMAIS = 4
+
+# Uma única entrada: a versão atual dos dados e o GeoJSON das regiões já serializado.
+_cache: Tuple[Optional[str], bytes] = (None, b"")
+
+
+def _assinatura_arquivo(caminho: str) -> Tuple[int, int]:
+    try:
+        stat = os.stat(caminho)
+    except OSError:
+        return 0, 0
+    return stat.st_mtime_ns, stat.st_size
+
+
+def versao_dados(geojson_path: str, csv_file: Optional[str] = None) -> str:
+    partes = _assinatura_arquivo(csv_file or CSV_FILE) + _assinatura_arquivo(geojson_path)
+    return "-".join(str(parte) for parte in partes)
+
+
+def _poligonos_da_geometria(geometria: dict) -> List[List[Anel]]:
+    tipo = geometria.get("type")
+    coordenadas = geometria.get("coordinates") or []
+    poligonos = [coordenadas] if tipo == "Polygon" else coordenadas if tipo == "MultiPolygon" else []
+    return [[[(float(ponto[0]), float(ponto[1])) for ponto in anel] for anel in poligono] for poligono in poligonos]
+
+
+def _aneis_da_geometria(geometria: dict) -> List[Anel]:
+    return [anel for poligono in _poligonos_da_geometria(geometria) for anel in poligono]
+
+
+def _area_com_sinal(anel: Anel) -> float:
+    return sum(a[0] * b[1] - b[0] * a[1] for a, b in zip(anel, anel[1:])) / 2
+
+
+def _contem_ponto(anel: Anel, ponto: Ponto) -> bool:
+    x, y = ponto
+    dentro = False
+    for (x1, y1), (x2, y2) in zip(anel, anel[1:]):
+        if (y1 > y) != (y2 > y) and x < (x2 - x1) * (y - y1) / (y2 - y1) + x1:
+            dentro = not dentro
+    return dentro
+
+
+def _simplificar_anel(anel: Anel, tolerancia: float) -> Anel:
+    if len(anel) <= 4:
+        return anel
+
+    manter = [False] * len(anel)
+    manter[0] = manter[-1] = True
+    pilha = [(0, len(anel) - 1)]
+    while pilha:
+        inicio, fim = pilha.pop()
+        (x1, y1), (x2, y2) = anel[inicio], anel[fim]
+        dx, dy = x2 - x1, y2 - y1
+        comprimento = (dx * dx + dy * dy) ** 0.5
+        maior_distancia, indice = 0.0, None
+        for i in range(inicio + 1, fim):
+            x, y = anel[i]
+            if comprimento:
+                distancia = abs(dy * (x - x1) - dx * (y - y1)) / comprimento
+            else:
+                distancia = ((x - x1) ** 2 + (y - y1) ** 2) ** 0.5
+            if distancia > maior_distancia:
+                maior_distancia, indice = distancia, i
+        if indice is not None and maior_distancia > tolerancia:
+            manter[indice] = True
+            pilha.append((inicio, indice))
+            pilha.append((indice, fim))
+
+    return [ponto for ponto, manter_ponto in zip(anel, manter) if manter_ponto]
+
+
+def _compactar_anel(anel: Anel) -> List[List[float]]:
+    compactado: List[List[float]] = []
+    for x, y in _simplificar_anel(anel, TOLERANCIA_SIMPLIFICACAO):
+        ponto = [round(x, CASAS_DECIMAIS), round(y, CASAS_DECIMAIS)]
+        if not compactado or compactado[-1] != ponto:
+            compactado.append(ponto)
+    return compactado
+
+
+def _compactar_poligonos(poligonos: List[List[Anel]]) -> List[List[List[List[float]]]]:
+    compactados = []
+    for poligono in poligonos:
+        aneis = [_compactar_anel(anel) for anel in poligono]
+        if len(aneis[0]) < 4:
+            continue
+        compactados.append([anel for anel in aneis if len(anel) >= 4])
+    return compactados
+
+
+def dissolver_aneis(aneis: List[Anel]) -> List[List[Anel]]:
+    """Une anéis vizinhos descartando as arestas que eles compartilham.
+
+    Os municípios do GeoJSON usam vértices idênticos nas divisas, então cada
+    aresta interna de uma região aparece duas vezes em sentidos opostos.
+    Devolve as coordenadas de um MultiPolygon (contornos externos com seus buracos).
+    """
+    if not aneis:
+        return []
+
+    arestas: Dict[Tuple[Ponto, Ponto], None] = {}
+    for anel in aneis:
+        for a, b in zip(anel, anel[1:]):
+            if a == b:
+                continue
+            if (b, a) in arestas:
+                del arestas[(b, a)]
+            else:
+                arestas[(a, b)] = None
+
+    saidas: Dict[Ponto, List[Ponto]] = defaultdict(list)
+    for a, b in arestas:
+        saidas[a].append(b)
+
+    contornos: List[Anel] = []
+    while saidas:
+        inicio = next(iter(saidas))
+        anel = [inicio]
+        atual = inicio
+        while atual in saidas:
+            proximos = saidas[atual]
+            proximo = proximos.pop()
+            if not proximos:
+                del saidas[atual]
+            anel.append(proximo)
+            atual = proximo
+            if atual == inicio:
+                break
+        if anel[-1] == inicio and len(anel) >= 4:
+            contornos.append(anel)
+
+    # Contornos externos mantêm a orientação dos anéis de entrada; buracos ficam invertidos.
+    sentido_externo = _area_com_sinal(aneis[0]) >= 0
+    externos = [anel for anel in contornos if (_area_com_sinal(anel) >= 0) == sentido_externo]
+    buracos = [anel for anel in contornos if (_area_com_sinal(anel) >= 0) != sentido_externo]
+
+    poligonos: List[List[Anel]] = [[anel] for anel in externos]
+    for buraco in buracos:
+        candidatos = [p for p in poligonos if _contem_ponto(p[0], buraco[0])]
+        if candidatos:
+            menor = min(candidatos, key=lambda p: abs(_area_com_sinal(p[0])))
+            menor.append(buraco)
+
+    return poligonos
+
+
+def montar_regioes_geojson(geojson_path: str, csv_file: Optional[str] = None) -> dict:
+    _, instituicoes, _ = load_dados(csv_file)
+    municipio_regiao = mapear_municipio_regiao(instituicoes)
+    totais_regiao = resumir_instituicoes(instituicoes)["regioes"]
+
+    municipios: dict = {}
+    if os.path.exists(geojson_path):
+        with open(geojson_path, encoding='utf-8') as f:
+            municipios = json.load(f)
+
+    aneis_por_regiao: Dict[str, List[Anel]] = defaultdict(list)
+    municipios_por_regiao: Dict[str, int] = defaultdict(int)
+    sem_regiao = []
+    for feature in municipios.get("features", []):
+        nome = (feature.get("properties") or {}).get("name")
+        regiao = municipio_regiao.get(nome)
+        if not regiao:
+            sem_regiao.append((nome, feature.get("geometry") or {}))
+            continue
+        aneis_por_regiao[regiao].extend(_aneis_da_geometria(feature.get("geometry") or {}))
+        municipios_por_regiao[regiao] += 1
+
+    features = []
+    for regiao in sorted(aneis_por_regiao):
+        poligonos = _compactar_poligonos(dissolver_aneis(aneis_por_regiao[regiao]))
+        if not poligonos:
+            continue
+        features.append({
+            "type": "Feature",
+            "properties": {
+                "tipo": "regiao",
+                "name": regiao,
+                "municipios": municipios_por_regiao[regiao],
+                "total": totais_regiao.get(regiao, 0),
+            },
+            "geometry": {
+                "type": "MultiPolygon",
+                "coordinates": poligonos,
+            },
+        })
+
+    # Municípios sem região conhecida (sem instituição no CSV) entram individualmente,
+    # para que a visão geral continue cobrindo o estado inteiro.
+    for nome, geometria in sem_regiao:
+        poligonos = _compactar_poligonos(_poligonos_da_geometria(geometria))
+        if not poligonos:
+            continue
+        features.append({
+            "type": "Feature",
+            "properties": {"tipo": "municipio", "name": nome},
+            "geometry": {
+                "type": "MultiPolygon",
+                "coordinates": poligonos,
+            },
+        })
+
+    return {"type": "FeatureCollection", "features": features}
+
+
+def serializar_regioes_geojson(geojson_path: str, csv_file: Optional[str] = None) -> bytes:
+    regioes = montar_regioes_geojson(geojson_path, csv_file)
+    return json.dumps(regioes, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def carregar_regioes_geojson(geojson_path: str) -> Tuple[str, bytes]:
+    global _cache
+
+    versao = versao_dados(geojson_path)
+    versao_em_cache, payload = _cache
+    if versao_em_cache != versao:
+        payload = serializar_regioes_geojson(geojson_path)
+        _cache = (versao, payload)
+    return versao, payload
@@ -1,10 +1,12 @@
 import csv
 import os
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Tuple
 
 CSV_FILE = os.environ.get("CSV_FILE", "dados.csv")
 DEMO_FILE = os.environ.get("DEMO_FILE", "demografia.csv")
 
+REGIOES_NAO_INFORMADAS = {"não informada", "nao informada", "não informado", "nao informado"}
+
 
 def to_non_negative_int(value, default=0):
     try:
@@ -17,7 +19,8 @@ def normalize_numeric_field(value):
     return str(to_non_negative_int(value, 0))
 
 
-def load_dados() -> Tuple[Dict[str, str], Dict[str, List[dict]], Dict[str, int]]:
+def load_dados(csv_file: Optional[str] = None) -> Tuple[Dict[str, str], Dict[str, List[dict]], Dict[str, int]]:
+    csv_file = csv_file or CSV_FILE
     instituicoes: Dict[str, List[dict]] = {}
     todos_municipios = set()
     municipios_totais: Dict[str, int] = {}
@@ -25,8 +28,8 @@ def load_dados() -> Tuple[Dict[str, str], Dict[str, List[dict]], Dict[str, int]]
     def safe_str(row, key):
         return (row.get(key) or "").strip()
 
-    if os.path.exists(CSV_FILE):
-        with open(CSV_FILE, newline='', encoding='utf-8') as f:
+    if os.path.exists(csv_file):
+        with open(csv_file, newline='', encoding='utf-8') as f:
             reader = csv.DictReader(f)
             for row in reader:
                 municipio = safe_str(row, "municipio")
@@ -70,10 +73,11 @@ def load_dados() -> Tuple[Dict[str, str], Dict[str, List[dict]], Dict[str, int]]
     return municipios_status, instituicoes, municipios_totais
 
 
-def load_demografia_rows() -> List[dict]:
+def load_demografia_rows(demo_file: Optional[str] = None) -> List[dict]:
+    demo_file = demo_file or DEMO_FILE
     registros: List[dict] = []
-    if os.path.exists(DEMO_FILE):
-        with open(DEMO_FILE, newline='', encoding='utf-8') as f:
+    if os.path.exists(demo_file):
+        with open(demo_file, newline='', encoding='utf-8') as f:
             reader = csv.DictReader(f)
             for row in reader:
                 tipo = (row.get("tipo_deficiencia") or "").strip()
@@ -130,7 +134,7 @@ def resumir_instituicoes(instituicoes: Dict[str, List[dict]]):
             totais["passe_livre"] += qt_passe
 
             regiao = (inst.get("regiao") or "").strip()
-            if not regiao or regiao.lower() in {"não informada", "nao informada", "não informado", "nao informado"}:
+            if not regiao or regiao.lower() in REGIOES_NAO_INFORMADAS:
                 continue
 
             regioes[regiao] = regioes.get(regiao, 0) + qt_ciptea + qt_cipf + qt_passe
@@ -138,6 +142,32 @@ def resumir_instituicoes(instituicoes: Dict[str, List[dict]]):
     return {"totais": totais, "regioes": regioes}
 
 
+def mapear_municipio_regiao(instituicoes: Dict[str, List[dict]]) -> Dict[str, str]:
+    municipio_regiao: Dict[str, str] = {}
+
+    for municipio, insts in instituicoes.items():
+        for inst in insts:
+            regiao = (inst.get("regiao") or "").strip()
+            if not regiao or regiao.lower() in REGIOES_NAO_INFORMADAS:
+                continue
+            municipio_regiao[municipio] = regiao
+            break
+
+    return municipio_regiao
+
+
+def contexto_index(csv_file: Optional[str] = None, demo_file: Optional[str] = None) -> dict:
+    municipios_status, municipios_instituicoes, municipios_totais = load_dados(csv_file)
+    demografia_registros = load_demografia_rows(demo_file)
+    return {
+        "municipiosStatus": municipios_status,
+        "municipiosInstituicoes": municipios_instituicoes,
+        "municipiosTotais": municipios_totais,
+        "demografia_distribuicao": preparar_demografia_por_deficiencia(demografia_registros),
+        "instituicoes_resumo": resumir_instituicoes(municipios_instituicoes),
+    }
+
+
 def save_demografia(linhas: List[dict]):
     with open(DEMO_FILE, 'w', newline='', encoding='utf-8') as f:
         fieldnames = ["tipo_deficiencia", "faixa_etaria", "quantidade"]
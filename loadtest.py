@@ -0,0 +1,342 @@
+"""Teste de carga local para dimensionar o gunicorn.
+
+Sobe o app com cada configuração de worker pedida, reproduz uma mistura de
+tráfego parecida com a de produção e imprime vazão, latências p50/p95/p99 e
+memória residente (RSS) de cada configuração.
+
+Exemplo:
+    python loadtest.py --configs sync:1 sync:4 gthread:2x4 --concorrencia 16 --duracao 20
+
+Cada configuração é ``classe:workers`` ou ``classe:workersxthreads``. As
+escritas do admin vão para cópias temporárias de dados.csv/demografia.csv, então
+os arquivos do repositório não são alterados.
+"""
+import argparse
+import http.client
+import json
+import os
+import random
+import shutil
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.parse
+from typing import Dict, List, Optional, Tuple
+
+RAIZ = os.path.dirname(os.path.abspath(__file__))
+
+# (peso, método, caminho) — cada visita busca a página, os dois CSV e a camada de regiões;
+# o GeoJSON completo dos municípios só vem quando o usuário aproxima o mapa. Salvamentos do admin são raros.
+MISTURA_TRAFEGO = [
+    (12, "GET", "/"),
+    (12, "GET", "/dados.csv"),
+    (12, "GET", "/demografia.csv"),
+    (10, "GET", "/sc_regioes.geojson"),
+    (5, "GET", "/sc_municipios.geojson"),
+    (4, "GET", "/sc/"),
+    (4, "GET", "/sc/dados.csv"),
+    (4, "GET", "/sc/demografia.csv"),
+    (4, "GET", "/sc/regioes.geojson"),
+    (2, "GET", "/sc/municipios.geojson"),
+    (14, "GET", "/static/js/app.js"),
+    (7, "GET", "/static/img/govsc.jpg"),
+    (7, "GET", "/static/img/fcee.jpg"),
+    (2, "POST", "/admin"),
+]
+
+ADMIN_USER = os.environ.get("ADMIN_USER", "admin")
+ADMIN_PASS = os.environ.get("ADMIN_PASS", "fcee2025")
+
+
+def parse_config(spec: str) -> Tuple[str, int, int]:
+    try:
+        classe, quantidade = spec.split(":", 1)
+        workers, _, threads = quantidade.partition("x")
+        return classe, max(int(workers), 1), max(int(threads or 1), 1)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"configuração inválida: {spec!r} (use classe:workers ou classe:workersxthreads)")
+
+
+def porta_livre() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def percentil(valores: List[float], p: float) -> float:
+    if not valores:
+        return 0.0
+    ordenados = sorted(valores)
+    indice = min(int(round(p / 100 * (len(ordenados) - 1))), len(ordenados) - 1)
+    return ordenados[indice]
+
+
+def _rss_kb(pid: int) -> int:
+    try:
+        with open(f"/proc/{pid}/status", encoding="utf-8") as f:
+            for linha in f:
+                if linha.startswith("VmRSS:"):
+                    return int(linha.split()[1])
+    except (OSError, ValueError, IndexError):
+        pass
+    return 0
+
+
+def _filhos(pid: int) -> List[int]:
+    filhos = []
+    try:
+        entradas = os.listdir("/proc")
+    except OSError:
+        return filhos
+    for entrada in entradas:
+        if not entrada.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entrada}/stat", encoding="utf-8") as f:
+                # O nome do processo pode ter espaços; o ppid vem logo depois do ")".
+                ppid = int(f.read().rsplit(")", 1)[1].split()[1])
+        except (OSError, ValueError, IndexError):
+            continue
+        if ppid == pid:
+            filhos.append(int(entrada))
+    return filhos
+
+
+def rss_total_mb(pid: int) -> Optional[float]:
+    """Soma o RSS do master e dos workers do gunicorn (só em Linux, via /proc)."""
+    if not os.path.isdir("/proc"):
+        return None
+    total = _rss_kb(pid) + sum(_rss_kb(filho) for filho in _filhos(pid))
+    return total / 1024
+
+
+class Cliente:
+    def __init__(self, porta: int):
+        self.porta = porta
+        self.conexao: Optional[http.client.HTTPConnection] = None
+        self.cookie = ""
+
+    def requisitar(self, metodo: str, caminho: str, corpo: Optional[Dict[str, str]] = None) -> http.client.HTTPResponse:
+        headers = {}
+        dados = None
+        if corpo is not None:
+            dados = urllib.parse.urlencode(corpo)
+            headers["Content-Type"] = "application/x-www-form-urlencoded"
+        if self.cookie:
+            headers["Cookie"] = self.cookie
+
+        for tentativa in range(2):
+            if self.conexao is None:
+                self.conexao = http.client.HTTPConnection("127.0.0.1", self.porta, timeout=30)
+            try:
+                self.conexao.request(metodo, caminho, body=dados, headers=headers)
+                resposta = self.conexao.getresponse()
+                resposta.read()
+            except (http.client.HTTPException, OSError):
+                self.fechar()
+                if tentativa:
+                    raise
+                continue
+
+            cookie = resposta.getheader("Set-Cookie")
+            if cookie:
+                self.cookie = cookie.split(";", 1)[0]
+            if resposta.will_close:
+                self.fechar()
+            return resposta
+        raise http.client.HTTPException("sem resposta")
+
+    def login(self):
+        self.requisitar("POST", "/login", {"username": ADMIN_USER, "password": ADMIN_PASS})
+
+    def fechar(self):
+        if self.conexao is not None:
+            self.conexao.close()
+            self.conexao = None
+
+
+def aguardar_servidor(porta: int, processo: subprocess.Popen, limite: float = 30.0):
+    fim = time.monotonic() + limite
+    while time.monotonic() < fim:
+        if processo.poll() is not None:
+            raise RuntimeError("gunicorn encerrou antes de aceitar conexões")
+        try:
+            conexao = http.client.HTTPConnection("127.0.0.1", porta, timeout=2)
+            conexao.request("GET", "/")
+            conexao.getresponse().read()
+            conexao.close()
+            return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f"gunicorn não respondeu em {limite:.0f}s")
+
+
+def iniciar_gunicorn(classe: str, workers: int, threads: int, porta: int, dados_dir: str) -> subprocess.Popen:
+    env = dict(os.environ)
+    # Sem isso cada POST do admin reexportaria o site para um diretório real e inflaria a latência.
+    env.pop("EXPORT_DIR", None)
+    env["CSV_FILE"] = os.path.join(dados_dir, "dados.csv")
+    env["DEMO_FILE"] = os.path.join(dados_dir, "demografia.csv")
+    env["ADMIN_USER"] = ADMIN_USER
+    env["ADMIN_PASS"] = ADMIN_PASS
+    comando = [
+        sys.executable, "-m", "gunicorn",
+        "--worker-class", classe,
+        "--workers", str(workers),
+        "--threads", str(threads),
+        "--bind", f"127.0.0.1:{porta}",
+        "--log-level", "warning",
+        "app:create_app()",
+    ]
+    return subprocess.Popen(comando, cwd=RAIZ, env=env)
+
+
+def parar_gunicorn(processo: subprocess.Popen):
+    if processo.poll() is None:
+        processo.send_signal(signal.SIGTERM)
+        try:
+            processo.wait(timeout=15)
+        except subprocess.TimeoutExpired:
+            processo.kill()
+            processo.wait()
+
+
+def executar_carga(porta: int, concorrencia: int, duracao: float, seed: int, pid: int) -> dict:
+    pesos = [peso for peso, _, _ in MISTURA_TRAFEGO]
+    latencias: List[float] = []
+    por_rota: Dict[str, List[float]] = {}
+    erros = 0
+    rss_pico = 0.0
+    trava = threading.Lock()
+    fim = time.monotonic() + duracao
+
+    def trabalhador(indice: int):
+        nonlocal erros
+        sorteio = random.Random(seed + indice)
+        cliente = Cliente(porta)
+        logado = False
+        locais: List[Tuple[str, float]] = []
+        erros_locais = 0
+        while time.monotonic() < fim:
+            _, metodo, caminho = sorteio.choices(MISTURA_TRAFEGO, weights=pesos)[0]
+            try:
+                if metodo == "POST" and not logado:
+                    cliente.login()
+                    logado = True
+                corpo = {"form_type": "instituicoes"} if metodo == "POST" else None
+                inicio = time.perf_counter()
+                resposta = cliente.requisitar(metodo, caminho, corpo)
+                decorrido = time.perf_counter() - inicio
+            except (http.client.HTTPException, OSError):
+                erros_locais += 1
+                continue
+            if resposta.status >= 400:
+                erros_locais += 1
+                continue
+            locais.append((f"{metodo} {caminho}", decorrido))
+        cliente.fechar()
+        with trava:
+            erros += erros_locais
+            for rota, decorrido in locais:
+                latencias.append(decorrido)
+                por_rota.setdefault(rota, []).append(decorrido)
+
+    threads = [threading.Thread(target=trabalhador, args=(i,), daemon=True) for i in range(concorrencia)]
+    inicio = time.monotonic()
+    for thread in threads:
+        thread.start()
+    while any(thread.is_alive() for thread in threads):
+        rss = rss_total_mb(pid)
+        if rss is not None:
+            rss_pico = max(rss_pico, rss)
+        time.sleep(0.5)
+    tempo_total = time.monotonic() - inicio
+
+    return {
+        "requisicoes": len(latencias),
+        "erros": erros,
+        "vazao_rps": len(latencias) / tempo_total if tempo_total else 0.0,
+        "p50_ms": percentil(latencias, 50) * 1000,
+        "p95_ms": percentil(latencias, 95) * 1000,
+        "p99_ms": percentil(latencias, 99) * 1000,
+        "rss_pico_mb": rss_pico or None,
+        "rss_final_mb": rss_total_mb(pid),
+        "rotas": {
+            rota: {
+                "requisicoes": len(valores),
+                "p50_ms": percentil(valores, 50) * 1000,
+                "p95_ms": percentil(valores, 95) * 1000,
+                "p99_ms": percentil(valores, 99) * 1000,
+            }
+            for rota, valores in sorted(por_rota.items())
+        },
+    }
+
+
+def medir_config(classe: str, workers: int, threads: int, args) -> dict:
+    dados_dir = tempfile.mkdtemp(prefix="passelivre-carga-")
+    for nome in ("dados.csv", "demografia.csv"):
+        origem = os.path.join(RAIZ, nome)
+        if os.path.exists(origem):
+            shutil.copy(origem, os.path.join(dados_dir, nome))
+
+    porta = porta_livre()
+    processo = iniciar_gunicorn(classe, workers, threads, porta, dados_dir)
+    try:
+        aguardar_servidor(porta, processo)
+        if args.aquecimento > 0:
+            executar_carga(porta, args.concorrencia, args.aquecimento, args.seed, processo.pid)
+        resultado = executar_carga(porta, args.concorrencia, args.duracao, args.seed, processo.pid)
+    finally:
+        parar_gunicorn(processo)
+        shutil.rmtree(dados_dir, ignore_errors=True)
+
+    resultado.update({"classe": classe, "workers": workers, "threads": threads})
+    return resultado
+
+
+def _formatar_mb(valor: Optional[float]) -> str:
+    return f"{valor:.1f}" if valor is not None else "n/d"
+
+
+def imprimir_tabela(resultados: List[dict]):
+    cabecalho = f"{'config':<18}{'req':>8}{'erros':>7}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'RSS pico MB':>13}"
+    print(cabecalho)
+    print("-" * len(cabecalho))
+    for r in resultados:
+        nome = f"{r['classe']}:{r['workers']}x{r['threads']}"
+        print(
+            f"{nome:<18}{r['requisicoes']:>8}{r['erros']:>7}{r['vazao_rps']:>9.1f}"
+            f"{r['p50_ms']:>9.1f}{r['p95_ms']:>9.1f}{r['p99_ms']:>9.1f}{_formatar_mb(r['rss_pico_mb']):>13}"
+        )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Teste de carga do mapa com varredura de configurações do gunicorn.")
+    parser.add_argument("--configs", nargs="+", type=parse_config, default=[parse_config("sync:1"), parse_config("sync:2"), parse_config("gthread:2x4")],
+                        help="configurações classe:workers[xthreads] (padrão: sync:1 sync:2 gthread:2x4)")
+    parser.add_argument("--concorrencia", type=int, default=8, help="clientes simultâneos (padrão: 8)")
+    parser.add_argument("--duracao", type=float, default=15.0, help="segundos de medição por configuração (padrão: 15)")
+    parser.add_argument("--aquecimento", type=float, default=2.0, help="segundos de aquecimento descartados (padrão: 2)")
+    parser.add_argument("--seed", type=int, default=2025, help="semente da mistura de tráfego")
+    parser.add_argument("--json", dest="json_path", help="grava os resultados completos (inclusive por rota) neste arquivo")
+    args = parser.parse_args(argv)
+
+    resultados = []
+    for classe, workers, threads in args.configs:
+        print(f"Medindo {classe}:{workers}x{threads}...", file=sys.stderr)
+        resultados.append(medir_config(classe, workers, threads, args))
+
+    imprimir_tabela(resultados)
+
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump(resultados, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,7 @@
 const mainGreen = '#1B5E20';
 const accentRed = '#BF1E2E';
+// Zoom da visão geral de SC em `/`; páginas /<uf>/ usam o zoom que enquadra o estado.
+const regionMaxZoom = 7;
 const faixaOrder = ['0-12', '13-17', '18-29', '30-44', '45-59', '18-59', '60+', '0-17'];
 const defaultFaixas = Object.fromEntries(faixaOrder.map((faixa) => [faixa, 0]));
 
@@ -419,6 +421,50 @@ function resolveAssetPath(fileName) {
   return `${base}${fileName}`;
 }
 
+async function fetchRegioesGeojson() {
+  try {
+    const response = await fetch(resolveAssetPath(document.body.dataset.regioesGeojson || 'sc_regioes.geojson'));
+    if (!response.ok) return null;
+    return await response.json();
+  } catch (error) {
+    return null;
+  }
+}
+
+function buildRegiaoPopupHtml(properties) {
+  return `<b>${properties.name}</b><br>Municípios com instituição: ${properties.municipios || 0}<br>Carteiras: ${properties.total || 0}`;
+}
+
+const regiaoColors = ['#c8e6c9', '#81c784', '#43a047', mainGreen];
+
+function buildRegiaoScale(regioesData) {
+  const totais = regioesData.features
+    .filter((feature) => feature.properties.tipo === 'regiao')
+    .map((feature) => Number(feature.properties.total) || 0);
+  const maximo = Math.max(0, ...totais);
+  // Faixas iguais entre 1 e o maior total; regiões sem carteiras ficam com a cor de "sem credenciamento".
+  const limites = regiaoColors.map((_, index) => Math.ceil((maximo * (index + 1)) / regiaoColors.length));
+
+  const colorFor = (total) => {
+    if (!total) return getColor('Nenhum');
+    const index = limites.findIndex((limite) => total <= limite);
+    return regiaoColors[index === -1 ? regiaoColors.length - 1 : index];
+  };
+
+  return { limites, colorFor };
+}
+
+function renderRegiaoLegend(limites) {
+  const legend = document.getElementById('regiaoLegend');
+  if (!legend) return;
+
+  const itens = regiaoColors.map((color, index) => {
+    const inicio = index === 0 ? 1 : limites[index - 1] + 1;
+    return `<div class="legend-item"><div class="legend-color" style="background: ${color};"></div> ${inicio} a ${limites[index]} carteiras</div>`;
+  });
+  legend.innerHTML = `<div style="font-weight:600; margin:6px 0 4px;">Carteiras por região (zoom afastado)</div>${itens.join('')}`;
+}
+
 async function setupMap(municipiosStatus, municipiosInstituicoes) {
   const map = L.map('map').setView([-27.2, -50.5], 7);
 
@@ -426,41 +472,101 @@ async function setupMap(municipiosStatus, municipiosInstituicoes) {
     attribution: '&copy; OpenStreetMap',
   }).addTo(map);
 
-  const response = await fetch(resolveAssetPath('sc_municipios.geojson'));
-  const data = await response.json();
-
-  const geoLayer = L.geoJson(data, {
-    style: (feature) => ({
-      color: '#333',
-      weight: 1,
-      fillColor: getColor(municipiosStatus[feature.properties.name] || 'Nenhum'),
-      fillOpacity: 0.65,
-    }),
-    onEachFeature: (feature, layer) => {
-      const nome = feature.properties.name;
-      const status = municipiosStatus[nome] || 'Nenhum';
-      const popupHtml = buildPopupHtml(nome, status, municipiosInstituicoes);
-
-      layer.bindPopup(popupHtml);
-      layer.featureStatus = status;
-    },
-  }).addTo(map);
+  const municipioStyle = (feature) => ({
+    color: '#333',
+    weight: 1,
+    fillColor: getColor(municipiosStatus[feature.properties.name] || 'Nenhum'),
+    fillOpacity: 0.65,
+  });
+
+  const bindMunicipioPopup = (feature, layer) => {
+    const nome = feature.properties.name;
+    const status = municipiosStatus[nome] || 'Nenhum';
+    layer.bindPopup(buildPopupHtml(nome, status, municipiosInstituicoes));
+    layer.featureStatus = status;
+  };
+
+  // O GeoJSON completo dos municípios é grande: só é baixado ao aproximar o mapa ou ao buscar.
+  let geoLayerPromise = null;
+  const loadGeoLayer = () => {
+    if (!geoLayerPromise) {
+      geoLayerPromise = fetch(resolveAssetPath(document.body.dataset.municipiosGeojson || 'sc_municipios.geojson'))
+        .then((response) => response.json())
+        .then((data) => L.geoJson(data, { style: municipioStyle, onEachFeature: bindMunicipioPopup }));
+    }
+    return geoLayerPromise;
+  };
+
+  // Em zoom baixo o estado inteiro cabe na tela: desenha as poucas regiões dissolvidas
+  // (e os municípios sem região) no lugar das centenas de polígonos municipais.
+  const regioesData = await fetchRegioesGeojson();
+  let regiaoLayer = null;
+  if (regioesData?.features?.length) {
+    const { limites, colorFor } = buildRegiaoScale(regioesData);
+    regiaoLayer = L.geoJson(regioesData, {
+      style: (feature) => (feature.properties.tipo === 'regiao'
+        ? { color: '#333', weight: 1.5, fillColor: colorFor(Number(feature.properties.total) || 0), fillOpacity: 0.65 }
+        : municipioStyle(feature)),
+      onEachFeature: (feature, layer) => {
+        if (feature.properties.tipo === 'regiao') {
+          layer.bindPopup(buildRegiaoPopupHtml(feature.properties));
+        } else {
+          bindMunicipioPopup(feature, layer);
+        }
+      },
+    });
+    renderRegiaoLegend(limites);
+  }
+
+  const regiaoLegend = document.getElementById('regiaoLegend');
+  let regiaoMaxZoom = regionMaxZoom;
+  let geoLayer = null;
+  const updateLayers = async () => {
+    const showRegioes = regiaoLayer && map.getZoom() <= regiaoMaxZoom;
+    if (regiaoLegend) regiaoLegend.style.display = showRegioes ? '' : 'none';
+
+    if (showRegioes) {
+      if (geoLayer && map.hasLayer(geoLayer)) map.removeLayer(geoLayer);
+      if (!map.hasLayer(regiaoLayer)) regiaoLayer.addTo(map);
+      return;
+    }
+
+    geoLayer = await loadGeoLayer();
+    // O zoom pode ter voltado para a visão geral enquanto o GeoJSON baixava.
+    if (regiaoLayer && map.getZoom() <= regiaoMaxZoom) return;
+    if (regiaoLayer && map.hasLayer(regiaoLayer)) map.removeLayer(regiaoLayer);
+    if (!map.hasLayer(geoLayer)) geoLayer.addTo(map);
+  };
+
+  // Páginas /<uf>/ servem qualquer estado: enquadra o mapa na geometria do estado e usa
+  // esse zoom como limite da visão geral, já que estados grandes e pequenos enquadram em zooms diferentes.
+  if (document.body.dataset.uf) {
+    const bounds = regiaoLayer ? regiaoLayer.getBounds() : (await loadGeoLayer()).getBounds();
+    regiaoMaxZoom = map.getBoundsZoom(bounds);
+    map.fitBounds(bounds, { animate: false });
+  }
+
+  map.on('zoomend', updateLayers);
+  await updateLayers();
 
-  return { map, geoLayer };
+  return { map, loadGeoLayer };
 }
 
-function setupSearch(map, geoLayer) {
+function setupSearch(map, loadGeoLayer) {
   const searchBox = document.getElementById('searchBox');
   if (!searchBox) return;
 
-  searchBox.addEventListener('keyup', (e) => {
-    if (e.key !== 'Enter' || !geoLayer) return;
+  searchBox.addEventListener('keyup', async (e) => {
+    if (e.key !== 'Enter') return;
 
     const query = searchBox.value.toLowerCase();
+    const geoLayer = await loadGeoLayer();
     geoLayer.eachLayer((layer) => {
       if (layer.feature?.properties?.name?.toLowerCase() === query) {
-        map.fitBounds(layer.getBounds());
-        layer.openPopup();
+        // O popup é aberto no mapa: a camada de municípios pode ainda não estar visível após o zoom.
+        const bounds = layer.getBounds();
+        map.once('moveend', () => map.openPopup(layer.getPopup().getContent(), bounds.getCenter()));
+        map.fitBounds(bounds);
       }
     });
   });
@@ -500,8 +606,8 @@ async function init() {
 
     renderPainel(demografiaFaixas, instituicoesResumo, municipiosResumo);
 
-    const { map, geoLayer } = await setupMap(municipiosStatus, municipiosInstituicoes);
-    setupSearch(map, geoLayer);
+    const { map, loadGeoLayer } = await setupMap(municipiosStatus, municipiosInstituicoes);
+    setupSearch(map, loadGeoLayer);
   } catch (error) {
     console.error('Erro ao carregar dados', error);
     const existingNotice = document.getElementById('loadError');